@@ -5,9 +5,43 @@ LICENSE file in the root directory of this source tree.
 """
 
 from pathlib import Path
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, Request
 
 from .app import app
 
+JSON_BODY_OPENAPI: dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"type": "object"}}},
+    }
+}
+
+
+async def json_body(request: Request) -> dict[str, Any]:
+    """Parse a JSON object request body with orjson.
+
+    Routes using this dependency declare their body with JSON_BODY_OPENAPI,
+    as FastAPI does not see it in the route signature.
+
+    Args:
+        request: Incoming HTTP request.
+
+    Returns:
+        dict[str, Any]: Decoded request body.
+    """
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not isinstance(body, dict):
+        raise HTTPException(
+            status_code=422, detail="request body must be a JSON object"
+        )
+    return body
+
 
 class API:
     """API base class."""
@@ -47,4 +81,4 @@ class API:
         Returns:
             str: URL path
         """
-        return app.url(path=str(Path(cls.prefix) / path))
+        return app.url(path=f"{cls.prefix.rstrip('/')}/{path.lstrip('/')}")
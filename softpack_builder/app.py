@@ -4,30 +4,50 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
-from datetime import datetime
+import time
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
+import orjson
 import typer
+from box import Box
 from fastapi import FastAPI
-from singleton_decorator import singleton
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from typer import Typer
 
 from softpack_builder import __version__
 
 from .config.settings import Settings
-from .url import URL
 
 
-@singleton
 class Application:
-    """Singleton Application class."""
+    """Application class.
+
+    A single instance is created at import time and shared as `app`.
+    """
 
     def __init__(self) -> None:
         """Constructor."""
-        self.router = FastAPI()
+        self.router = FastAPI(default_response_class=ORJSONResponse)
+        self.router.add_middleware(GZipMiddleware, minimum_size=500)
         self.commands = Typer()
         self.settings = Settings.parse_obj({})
+        server = self.settings.server
+        self.netloc = f"{server.host}:{server.port}"
+
+    @cached_property
+    def settings_box(self) -> Box:
+        """Settings as a Box, shared by classes that are pickled by value.
+
+        Pydantic models cannot be pickled by value with cloudpickle, so the
+        classes sent to Prefect workers hold this plain copy instead.
+
+        Returns:
+            Box: Package settings.
+        """
+        return Box(self.settings.dict())
 
     def register_api(self, api: Any) -> None:
         """Register an API with the application.
@@ -38,19 +58,20 @@ class Application:
         Returns:
             None.
         """
+        missing = f"type object '{api.__name__}' has no attribute"
 
-        def include_router() -> None:
-            return self.router.include_router(api.router)
+        router = getattr(api, "router", None)
+        if router is not None:
+            self.router.include_router(router)
+        else:
+            typer.echo(f"{missing} 'router'")
 
-        def add_typer() -> None:
+        commands = getattr(api, "commands", None)
+        if commands is not None:
             name = Path(api.prefix).name
-            return self.commands.add_typer(api.commands, name=name)
-
-        for registry_func in [include_router, add_typer]:
-            try:
-                registry_func()
-            except AttributeError as e:
-                typer.echo(e)
+            self.commands.add_typer(commands, name=name)
+        else:
+            typer.echo(f"{missing} 'commands'")
 
     def echo(self, *args: Any, **kwargs: Any) -> Any:
         """Print a message using Typer/Click echo.
@@ -72,8 +93,7 @@ class Application:
         """
         return self.commands()
 
-    @staticmethod
-    def url(path: str = "/", scheme: str = "http") -> str:
+    def url(self, path: str = "/", scheme: str = "http") -> str:
         """Get absolute URL path.
 
         Args:
@@ -83,25 +103,44 @@ class Application:
         Returns:
             str: URL path
         """
-        url = URL(
-            scheme=scheme,
-            netloc=f"{app.settings.server.host}:{app.settings.server.port}",
-            path=path,
-        )
-        return str(url)
+        if not path.startswith("/"):
+            path = f"/{path}"
+        return f"{scheme}://{self.netloc}{path}"
 
 
 app = Application()
 
 
-@app.router.get("/")
-def root() -> dict[str, Any]:
+_STATUS = orjson.dumps({"softpack": {"builder": {"version": __version__}}})
+_TIMESTAMPS: dict[int, str] = {}
+
+
+def timestamp() -> str:
+    """Get the current local time with microsecond resolution.
+
+    The formatted seconds are memoised, so only the fractional part is
+    formatted for repeated calls within the same second.
+
+    Returns:
+        str: Current time as a string.
+    """
+    seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    prefix = _TIMESTAMPS.get(seconds)
+    if prefix is None:
+        prefix = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+        _TIMESTAMPS.clear()
+        _TIMESTAMPS[seconds] = prefix
+    return f"{prefix}.{nanoseconds // 1000:06d}"
+
+
+@app.router.get("/", response_class=Response)
+def root() -> Response:
     """HTTP GET handler for / route.
 
     Returns:
-        dict: Application status to return.
+        Response: Application status to return.
     """
-    return {
-        "time": str(datetime.now()),
-        "softpack": {"builder": {"version": __version__}},
-    }
+    content = b"".join(
+        [b'{"time":', orjson.dumps(timestamp()), b",", _STATUS[1:]]
+    )
+    return Response(content, media_type="application/json")
@@ -5,12 +5,10 @@ LICENSE file in the root directory of this source tree.
 """
 
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterator
+from typing import TYPE_CHECKING, Iterator
 
-import oras.client
-import oras.oci
-import semver
 from box import Box
 
 from .app import app
@@ -18,11 +16,38 @@ from .logger import LogMixin
 from .serializable import Serializable
 from .url import URL
 
+if TYPE_CHECKING:
+    import oras.client
+
+
+@lru_cache(maxsize=None)
+def oras_client(
+    url: str, username: str, password: str
+) -> "oras.client.OrasClient":
+    """Get a logged-in ORAS client shared between Registry instances.
+
+    The cache lives in this function rather than on Registry, so clients
+    are not pickled with the classes sent to Prefect workers.
+
+    Args:
+        url: Registry URL.
+        username: Registry username.
+        password: Registry password.
+
+    Returns:
+        oras.client.OrasClient: An ORAS client.
+    """
+    import oras.client
+
+    client = oras.client.OrasClient()
+    client.login(username=username, password=password)
+    return client
+
 
 class Artifacts(Serializable):
     """Artifacts repo access class."""
 
-    settings = Box(app.settings.dict())
+    settings = app.settings_box
 
     def __init__(self, name: str) -> None:
         """Constructor."""
@@ -45,6 +70,8 @@ class Artifacts(Serializable):
     class Registry(LogMixin):
         """Artifacts registry."""
 
+        version_pattern = re.compile(r"^(\d+)\.(\d+)$")
+
         def __init__(self, name: str, registry: Box) -> None:
             """Constructor.
 
@@ -57,39 +84,31 @@ class Artifacts(Serializable):
             self.url = registry.url
             self.username = registry.username
             self.password = registry.password
-            self.client = oras.client.OrasClient()
-            self.client.login(
-                username=registry.username, password=registry.password
+            path = "-".join(self.name.parent.parts)
+            self.image_url = URL(
+                self.url, path=str(Path(path, self.name.name))
             )
 
-        @staticmethod
-        def parse_version(version: str) -> semver.Version:
-            """Parse a version.
-
-            Args:
-                version: A semantic version string.
+        @property
+        def client(self) -> "oras.client.OrasClient":
+            """Return a logged-in ORAS client for the registry.
 
             Returns:
-                semver.Version: Parsed semantic version.
+                oras.client.OrasClient: A client shared in this process.
             """
-            try:
-                return semver.Version.parse(
-                    version, optional_minor_and_patch=True
-                )
-            except ValueError:
-                return semver.Version(0)
+            return oras_client(str(self.url), self.username, self.password)
 
-        @property
-        def image_url(self) -> URL:
-            """Return image URL in the container registry.
+        def tags(self) -> list[str]:
+            """Get the image tags from the container registry.
 
             Returns:
-                URL: Image URL.
+                list[str]: Image tags, empty if none could be fetched.
             """
-            url = URL(self.url)
-            path = "-".join(self.name.parent.parts)
-            url = URL(self.url, path=str(Path(path, self.name.name)))
-            return url
+            url = URL(str(self.image_url), scheme="")
+            try:
+                return self.client.get_tags(str(url))
+            except ValueError:
+                return []
 
         def next_version(self) -> str:
             """Get the next available image version number.
@@ -97,16 +116,13 @@ class Artifacts(Serializable):
             Returns:
                 str: A semantic version number as a string
             """
-            try:
-                url = URL(str(self.image_url), scheme="")
-                tags = self.client.get_tags(str(url))
-                pattern = re.compile(r"^\d+\.\d+$")
-                tags = filter(pattern.match, tags)
-                latest = sorted(map(self.parse_version, tags))[-1]
-                version = latest.bump_major()
-                return f"{version.major}.{version.minor}"
-            except ValueError:
-                return "1.0"
+            versions = [
+                (int(match[1]), int(match[2]))
+                for match in map(self.version_pattern.match, self.tags())
+                if match
+            ]
+            major, _ = max(versions, default=(0, 0))
+            return f"{major + 1}.0"
 
     def default_registry(self, name: str) -> Registry:
         """Get the default artifacts registry.
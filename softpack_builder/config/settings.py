@@ -5,10 +5,11 @@ LICENSE file in the root directory of this source tree.
 """
 
 import sys
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Tuple
+from typing import TYPE_CHECKING, Any, Optional, Tuple
 
-import hvac
 import yaml
 from pydantic import BaseSettings
 from pydantic.env_settings import SettingsSourceCallable
@@ -26,6 +27,60 @@ from .models import (
     VaultConfig,
 )
 
+if TYPE_CHECKING:
+    import hvac
+
+try:
+    from yaml import CSafeDumper as YAMLDumper  # noqa: F401
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as YAMLDumper  # type: ignore  # noqa: F401
+    from yaml import SafeLoader as YAMLLoader  # type: ignore
+
+_VAULT_SECRETS: dict[tuple[Any, ...], tuple[float, dict[str, Any]]] = {}
+
+
+@lru_cache(maxsize=None)
+def load_yaml(path: Path, mtime: int) -> dict[str, Any]:
+    """Load a YAML file, memoised by path and modification time.
+
+    Args:
+        path: YAML file path.
+        mtime: File modification time in nanoseconds.
+
+    Returns:
+        dict[str, Any]: Parsed file contents.
+    """
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=YAMLLoader) or {}
+
+
+@lru_cache(maxsize=8)
+def vault_client(url: Optional[str], token: Optional[str]) -> "hvac.Client":
+    """Get a HashiCorp Vault client, shared per URL and token.
+
+    Args:
+        url: Vault server URL.
+        token: Vault access token.
+
+    Returns:
+        hvac.Client: A Vault client.
+    """
+    import hvac
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return hvac.Client(url=url, token=token, session=session)
+
 
 class Settings(BaseSettings, Serializable):
     """Package settings."""
@@ -46,6 +101,7 @@ class Settings(BaseSettings, Serializable):
         config_file = "config.yml"
         default_config_dir = "conf"
         user_config_dir = ".softpack/builder"
+        vault_ttl = 300
 
         @classmethod
         def file_settings(
@@ -60,10 +116,11 @@ class Settings(BaseSettings, Serializable):
             Returns:
                 dict[str, Any]: A dictionary of settings.
             """
-            if not path.is_file():
+            try:
+                mtime = path.stat().st_mtime_ns
+            except FileNotFoundError:
                 return {}
-            with open(path) as f:
-                return yaml.safe_load(f)
+            return dict(load_yaml(path, mtime))
 
         @classmethod
         def defaults(cls, settings: BaseSettings) -> dict[str, Any]:
@@ -92,10 +149,10 @@ class Settings(BaseSettings, Serializable):
             """
             path = Path.home() / cls.user_config_dir / cls.config_file
             overrides = cls.file_settings(path, settings)
-            try:
-                overrides |= cls.vault(VaultConfig(**overrides["vault"]))
-            except KeyError as e:
-                print(e, file=sys.stderr)
+            vault = overrides.get("vault")
+            if vault is not None:
+                # secrets replace whole top-level sections, no deep merge
+                overrides |= cls.vault(VaultConfig(**vault))
             return overrides
 
         @classmethod
@@ -108,15 +165,17 @@ class Settings(BaseSettings, Serializable):
             Returns:
                 dict[str, Any]: Settings loaded from HashiCorp Vault.
             """
+            key = (vault.url, vault.path, vault.token)
+            cached = _VAULT_SECRETS.get(key)
+            if cached and time.monotonic() - cached[0] < cls.vault_ttl:
+                return dict(cached[1])
             try:
-                client = hvac.Client(
-                    url=vault.url,
-                    token=vault.token,
-                )
+                client = vault_client(vault.url, vault.token)
                 secret = client.kv.v1.read_secret(
                     path=str(vault.path), mount_point="/"
                 )
-                return secret["data"]
+                _VAULT_SECRETS[key] = (time.monotonic(), secret["data"])
+                return dict(secret["data"])
             except Exception as e:
                 print(e, file=sys.stderr)
                 return {}
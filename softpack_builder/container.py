@@ -5,10 +5,9 @@ LICENSE file in the root directory of this source tree.
 """
 
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
-from box import Box
-
 from .artifacts import Artifacts
 from .logger import LogMixin
 from .serializable import Serializable
@@ -38,7 +37,7 @@ class Container(Serializable):
             super().__init__()
             self.name = name
             self.path = path
-            self.model = Box(model)
+            self.model = SimpleNamespace(**model)
             self.artifacts = artifacts
 
         def build_image(self) -> None:
@@ -4,10 +4,14 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
+import asyncio
 from typing import Any, Optional
+from uuid import UUID
 
 from prefect import Flow
+from prefect.client.orchestration import get_client
 from prefect.deployments import Deployment, run_deployment
+from prefect.utilities.asyncutils import sync_compatible
 
 
 class DeploymentRegistry:
@@ -22,14 +26,20 @@ class DeploymentRegistry:
         Returns:
             dict: A dictionary of flows and their corresponding deployments.
         """
-        self.deployments = {
-            flow: Deployment.build_from_flow(
-                flow=flow,
-                name=f"{flow.__name__} [default-deployment]",
-                apply=True,
+
+        async def build() -> list[Deployment]:
+            return await asyncio.gather(
+                *[
+                    Deployment.build_from_flow(
+                        flow=flow,
+                        name=f"{flow.__name__} [default-deployment]",
+                        apply=True,
+                    )
+                    for flow in flows
+                ]
             )
-            for flow in flows
-        }
+
+        self.deployments = dict(zip(flows, asyncio.run(build())))
 
     def find(self, flow: Flow) -> Deployment:
         """Find a registered deployment for a given flow.
@@ -68,3 +78,16 @@ class DeploymentRegistry:
             timeout=timeout,
             **kwargs,
         )
+
+    @sync_compatible
+    async def read_flow_run(self, flow_run_id: UUID) -> Any:
+        """Read the current state of a flow run.
+
+        Args:
+            flow_run_id: Flow run ID.
+
+        Returns:
+            Any: The flow run.
+        """
+        async with get_client() as client:
+            return await client.read_flow_run(flow_run_id)
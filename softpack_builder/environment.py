@@ -4,41 +4,82 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
-import dataclasses
+import atexit
+import copy
+import hashlib
 import importlib
+import os
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, cast
-from uuid import UUID
+from typing import TYPE_CHECKING, Any, Callable, cast
 
-import httpx
+import orjson
 import prefect
 import typer
 import yaml
-from box import Box
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from prefect import Task, flow
 from prefect.context import FlowRunContext
-from prefect_dask.task_runners import DaskTaskRunner
-from pydantic import BaseModel
+from prefect.task_runners import BaseTaskRunner, ConcurrentTaskRunner
 from typer import Typer
 from typing_extensions import Annotated
 
-from .api import API
+from .api import API, JSON_BODY_OPENAPI, json_body
 from .app import app
 from .artifacts import Artifacts
+from .config.settings import YAMLDumper, YAMLLoader, load_yaml
 from .deployments import DeploymentRegistry
-from .logger import LogMixin
+from .logger import LogMixin, make_directory
 from .modulefile import ModuleFile
+from .shell import ShellCommand
 from .spack import Spack
 
+if TYPE_CHECKING:
+    import httpx
+
+
+@lru_cache(maxsize=None)
+def container_class(name: str) -> type:
+    """Resolve a container class from its name.
+
+    Args:
+        name: Class name, qualified with its module in this package.
+
+    Returns:
+        type: The container class.
+    """
+    module, _, cls = name.rpartition('.')
+    module = ".".join([str(Path(__file__).parent.name), module])
+    return getattr(importlib.import_module(module), cls)
+
+
+@lru_cache(maxsize=None)
+def http_client() -> "httpx.Client":
+    """Get an HTTP client shared across requests to the service.
+
+    Returns:
+        httpx.Client: A pooled HTTP client.
+    """
+    import httpx
+
+    client = httpx.Client(
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    )
+    atexit.register(client.close)
+    return client
+
 
 class Environment(LogMixin):
     """Encapsulation for a SoftPack environment."""
 
-    settings = Box(app.settings.dict())
+    settings = app.settings_box
 
-    @dataclass
+    @dataclass(frozen=True)
     class Model:
         """SoftPack environment data model."""
 
@@ -51,7 +92,10 @@ class Environment(LogMixin):
             Returns:
                 dict: A dictionary representation of the model.
             """
-            return dataclasses.asdict(self)
+            return {
+                "description": self.description,
+                "packages": list(self.packages),
+            }
 
         @classmethod
         def from_yaml(cls, filename: Path) -> "Environment.Model":
@@ -63,8 +107,9 @@ class Environment(LogMixin):
             Returns:
                 Model: A Model object created from YAML file.
             """
-            with open(filename) as file:
-                return Environment.Model(**yaml.safe_load(file))
+            path = Path(filename)
+            spec = load_yaml(path, path.stat().st_mtime_ns)
+            return Environment.Model(**copy.deepcopy(spec))
 
     @classmethod
     def create(cls, name: str, model: dict[str, Any]) -> "Environment":
@@ -88,22 +133,22 @@ class Environment(LogMixin):
             model: Environment parameters.
         """
         self.name = name
-        self.model = Box(model.dict())
+        self.model = model
         context: FlowRunContext = cast(
             FlowRunContext, prefect.context.FlowRunContext.get()
         )
         self.id = context.flow_run.id if context else None
-        self.path = self.settings.environments.path / f"{self.id}"
-        self.path.mkdir(parents=True, exist_ok=True)
+        self.path = make_directory(
+            self.settings.environments.path / f"{self.id}"
+        )
         self.spack = Spack(self.name, self.path)
         self.artifacts = Artifacts(self.name)
-        module, _, cls = self.settings.container.module.rpartition('.')
-        module = ".".join([str(Path(__file__).parent.name), module])
-        container = getattr(importlib.import_module(module), cls)()
+        container = container_class(self.settings.container.module)()
+        spec = self.model.dict()
         self.builder = container.Builder(
             name=self.name,
             path=self.path,
-            model=self.model,
+            model=spec,
             artifacts=self.artifacts,
         )
         registry = self.artifacts.default_registry(self.name)
@@ -112,7 +157,7 @@ class Environment(LogMixin):
             id=self.id,
             name=self.name,
             path=self.path,
-            model=self.model,
+            model=spec,
             artifacts=self.artifacts,
             version=self.image_version,
         )
@@ -133,26 +178,19 @@ class Environment(LogMixin):
             fn, task_run_name=f"{fn.__name__} [{{env.name}}]", **kwargs
         )
 
-    def stage(self) -> "Environment":
-        """Stage environment in a new directory.
+    def prepare(self) -> "Environment":
+        """Stage the environment and create its manifest in one shell.
 
         Returns:
             Environment: A reference to self.
         """
         self.logger.info(
-            f"staging environment: name={self.name}, path={self.path}"
+            "preparing environment: name=%s, path=%s", self.name, self.path
         )
-        self.spack.env_create()()
-        return self
-
-    def create_manifest(self) -> "Environment":
-        """Create Spack manifest.
-
-        Returns:
-             Environment: A reference to self.
-        """
-        self.logger.info(f"creating manifest: name={self.name}")
-        self.spack.env_add(self.model.packages)()
+        command = ShellCommand.chain(
+            self.spack.env_create(), self.spack.env_add(self.model.packages)
+        )
+        command()
         self.artifacts.add(
             self.spack.manifest.filename,
             Path(self.name, self.spack.manifest.filename.name),
@@ -165,7 +203,7 @@ class Environment(LogMixin):
         Returns:
             Environment: A reference to self.
         """
-        self.logger.info(f"concretizing environment: name={self.name}")
+        self.logger.info("concretizing environment: name=%s", self.name)
         self.spack.env_concretize()()
         return self
 
@@ -175,7 +213,7 @@ class Environment(LogMixin):
         Returns:
             Environment: A reference to self.
         """
-        self.logger.info(f"building image: name={self.name}")
+        self.logger.info("building image: name=%s", self.name)
         self.builder.build_image()
         return self
 
@@ -185,7 +223,7 @@ class Environment(LogMixin):
         Returns:
             Environment: A reference to self.
         """
-        self.logger.info(f"pushing image: name={self.name}")
+        self.logger.info("pushing image: name=%s", self.name)
         for registry in self.artifacts.registries():
             self.builder.push_image(registry, self.image_version)
         return self
@@ -196,7 +234,7 @@ class Environment(LogMixin):
         Returns:
             Environment: A reference to self.
         """
-        self.logger.info(f"creating modulefile: name={self.name}")
+        self.logger.info("creating modulefile: name=%s", self.name)
         self.modulefile.create()
         return self
 
@@ -208,19 +246,9 @@ class EnvironmentAPI(API):
     router = APIRouter(prefix=prefix)
     commands = Typer(help="Commands for managing environments.")
     deployments = DeploymentRegistry()
-
-    class Status(BaseModel):
-        """Status class for returning the results from API."""
-
-        class State(BaseModel):
-            """State returned from the API."""
-
-            type: Any
-
-        id: UUID
-        name: str
-        created: Any
-        state: State
+    inflight: dict[bytes, Future] = {}
+    inflight_limit = 1024
+    inflight_lock = threading.Lock()
 
     @staticmethod
     @commands.command("build", help="Build an environment.")
@@ -236,56 +264,134 @@ class EnvironmentAPI(API):
         Returns:
             None.
         """
-        model = Environment.Model.from_yaml(filename)
-        response = httpx.post(
+        with open(filename, "rb") as file:
+            model = yaml.load(file, Loader=YAMLLoader)
+        response = http_client().post(
             EnvironmentAPI.url("build"),
-            json={"name": str(name), "model": model.dict()},
+            content=orjson.dumps({"name": str(name), "model": model}),
+            headers={"content-type": "application/json"},
         )
-        app.echo(yaml.dump(response.json(), sort_keys=False))
+        status = response.json()
+        app.echo(yaml.dump(status, Dumper=YAMLDumper, sort_keys=False))
 
     @staticmethod
-    @router.post("/build")
+    @router.post(
+        "/build",
+        response_class=ORJSONResponse,
+        openapi_extra=JSON_BODY_OPENAPI,
+    )
     def build_environment_route(
-        params: dict[str, Any], reqyuest: Request
-    ) -> dict[str, Any]:
+        reqyuest: Request, params: dict[str, Any] = Depends(json_body)
+    ) -> ORJSONResponse:
         """HTTP POST handler for /build route.
 
+        The environment model is checked before dispatch, so an invalid
+        spec is rejected with 422 instead of failing in the flow. Identical
+        requests made while a run is still in progress are given that run
+        instead of starting another build.
+
         Args:
             params: Environment parameters.
 
         Returns:
-            dict: Status from deployment run.
+            ORJSONResponse: Status from deployment run.
         """
-        response = EnvironmentAPI.deployments.run(
-            build_environment, parameters=params
+        try:
+            if set(params) != {"name", "model"}:
+                raise TypeError("expected 'name' and 'model' parameters")
+            Environment.Model(**params["model"])
+        except TypeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        key = hashlib.blake2b(
+            orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).digest()
+        response = EnvironmentAPI.run_once(key, params)
+        return ORJSONResponse(
+            {
+                "id": response.id,
+                "name": response.name,
+                "created": response.created.isoformat(),
+                "state": {"type": response.state.type},
+            }
         )
-        return EnvironmentAPI.Status(**response.dict()).dict()
 
+    @staticmethod
+    def run_once(key: bytes, params: dict[str, Any]) -> Any:
+        """Run the build deployment unless an identical run is in progress.
 
-@Environment.task
-def stage_environment(env: Environment) -> Environment:
-    """Stage an environment.
+        The first request for a key leaves a placeholder in the in-flight
+        table, so the Prefect API is called without holding the lock.
+        Entries are removed once their run has reached a final state, and
+        the oldest are dropped when the table grows past inflight_limit.
 
-    Args:
-        env: Environment to stage.
+        Args:
+            key: Digest of the request parameters.
+            params: Environment parameters.
+
+        Returns:
+            Any: The new or in-progress flow run.
+        """
+        inflight = EnvironmentAPI.inflight
+        while True:
+            future: Future = Future()
+            with EnvironmentAPI.inflight_lock:
+                pending = inflight.setdefault(key, future)
+                while len(inflight) > EnvironmentAPI.inflight_limit:
+                    del inflight[next(iter(inflight))]
+            if pending is future:
+                try:
+                    response = EnvironmentAPI.deployments.run(
+                        build_environment, parameters=params
+                    )
+                except BaseException as error:
+                    with EnvironmentAPI.inflight_lock:
+                        if inflight.get(key) is future:
+                            del inflight[key]
+                    future.set_exception(error)
+                    raise
+                future.set_result(response.id)
+                return response
+
+            response = EnvironmentAPI.deployments.read_flow_run(
+                pending.result()
+            )
+            if not response.state.is_final():
+                return response
+            with EnvironmentAPI.inflight_lock:
+                if inflight.get(key) is pending:
+                    del inflight[key]
+
+
+def task_runner() -> BaseTaskRunner:
+    """Task runner for environment flows.
+
+    Tasks run on a long-lived Dask cluster when DASK_SCHEDULER_ADDRESS is
+    set, otherwise on threads in the flow process.
 
     Returns:
-        Environment: An environment being staged.
+        BaseTaskRunner: A Prefect task runner.
     """
-    return env.stage()
+    address = os.environ.get("DASK_SCHEDULER_ADDRESS")
+    if address is None:
+        return ConcurrentTaskRunner()  # type: ignore
+
+    from prefect_dask import DaskTaskRunner
+
+    return DaskTaskRunner(address=address)
 
 
 @Environment.task
-def create_manifest(env: Environment) -> Environment:
-    """Create an environment manifest.
+def prepare_environment(env: Environment) -> Environment:
+    """Stage an environment and create its manifest.
 
     Args:
-        env: Environment for creating the manifest.
+        env: Environment to prepare.
 
     Returns:
-        Environment: The environment being built.
+        Environment: An environment ready to be built.
     """
-    return env.create_manifest()
+    return env.prepare()
 
 
 @Environment.task
@@ -342,7 +448,7 @@ def create_modulefile(env: Environment) -> None:
 
 @flow(
     name="build_environment",
-    task_runner=DaskTaskRunner(),
+    task_runner=task_runner(),
     flow_run_name="{name}",
 )
 def build_environment(name: str, model: dict[str, Any]) -> dict[str, Any]:
@@ -356,13 +462,11 @@ def build_environment(name: str, model: dict[str, Any]) -> dict[str, Any]:
         dict: Flow run context.
     """
     env = Environment.create(name, model)
-    env = cast(Environment, stage_environment.submit(env))
-    env = cast(Environment, create_manifest.submit(env))
+    env = cast(Environment, prepare_environment.submit(env))
     # env = cast(Environment, concretize_environment.submit(env))
 
     env = cast(Environment, build_image.submit(env))
-    env = cast(Environment, push_image.submit(env))
-
+    push_image.submit(env)
     create_modulefile.submit(env)
 
     context = cast(FlowRunContext, prefect.context.get_run_context())
@@ -6,23 +6,55 @@ LICENSE file in the root directory of this source tree.
 
 import importlib
 import logging
+from functools import lru_cache
+from pathlib import Path
 from typing import Union, cast
 
 import prefect
-from box import Box
 from prefect.context import FlowRunContext
 
 from .app import app
 from .serializable import Serializable
 
 
+@lru_cache(maxsize=None)
+def formatter_class(name: str) -> type:
+    """Resolve a log formatter class from its dotted name.
+
+    Args:
+        name: Fully qualified class name.
+
+    Returns:
+        type: Formatter class.
+    """
+    module, _, cls = name.rpartition('.')
+    return getattr(importlib.import_module(module), cls)
+
+
+@lru_cache(maxsize=256)
+def make_directory(path: Path) -> Path:
+    """Create a directory and its parents, once per path in this process.
+
+    Args:
+        path: Directory to create.
+
+    Returns:
+        Path: The directory.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 class LogMixin(Serializable):
     """Log mixin."""
 
     class Logger:
         """Logger class."""
 
-        settings = Box(app.settings.dict())
+        settings = app.settings_box
+        root = settings.environments.path
+        filename = settings.logging.filename
+        formatter = settings.logging.formatters["prefect"]
 
         def __init__(self) -> None:
             """Constructor."""
@@ -30,8 +62,7 @@ class LogMixin(Serializable):
                 FlowRunContext, prefect.context.FlowRunContext.get()
             )
             self.flow_run_id = context.flow_run.id if context else None
-            self.path = self.settings.environments.path / f"{self.flow_run_id}"
-            self.path.mkdir(parents=True, exist_ok=True)
+            self.path = make_directory(self.root / f"{self.flow_run_id}")
             self.flow_logger: logging.LoggerAdapter = self.init_logger()
             self.task_logger: Union[logging.LoggerAdapter, None] = None
 
@@ -59,12 +90,10 @@ class LogMixin(Serializable):
             Returns:
                 Logger: A python Logger object.
             """
-            filename = self.path / self.settings.logging.filename
+            filename = self.path / self.filename
             handler = logging.FileHandler(filename=str(filename))
-            args = self.settings.logging.formatters.prefect.to_dict()
-            formatter_class = args.pop("class")
-            module, _, cls = formatter_class.rpartition('.')
-            formatter = getattr(importlib.import_module(module), cls)(**args)
+            args = dict(self.formatter)
+            formatter = formatter_class(args.pop("class"))(**args)
             handler.setFormatter(formatter)
             logger = prefect.get_run_logger()
             if isinstance(logger, logging.LoggerAdapter):
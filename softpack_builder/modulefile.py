@@ -7,23 +7,45 @@ LICENSE file in the root directory of this source tree.
 import re
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any, Optional
 from uuid import UUID
 
 import jinja2
 import prefect
-from box import Box
 
 from .app import app
 from .artifacts import Artifacts
 from .serializable import Serializable
 
 
+@lru_cache(maxsize=None)
+def template_environment(path: Path) -> jinja2.Environment:
+    """Get a Jinja2 environment for a template directory.
+
+    Templates are compiled once and not checked for changes on disk.
+
+    Args:
+        path: Template directory.
+
+    Returns:
+        jinja2.Environment: A Jinja2 environment.
+    """
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(path), cache_size=-1, auto_reload=False
+    )
+
+
 class ModuleFile(Serializable):
     """Module file writer."""
 
-    settings = Box(app.settings.dict())
+    settings = app.settings_box
+    patterns = [
+        (re.compile(template.pattern), template.name)
+        for template in app.settings_box.modules.templates.patterns
+    ]
 
     @dataclass
     class BuildInfo:
@@ -57,7 +79,7 @@ class ModuleFile(Serializable):
         self.id = id
         self.name = name
         self.path = path
-        self.model = Box(model)
+        self.model = SimpleNamespace(**model)
         self.version = version
         self.artifacts = artifacts
         self.filename = self.path / self.settings.modules.name
@@ -93,10 +115,9 @@ class ModuleFile(Serializable):
         Returns:
             str: Template name.
         """
-        for template in self.settings.modules.templates.patterns:
-            regex = re.compile(template.pattern)
-            if list(filter(regex.match, self.model.packages)):
-                return template.name
+        for regex, name in self.patterns:
+            if any(map(regex.match, self.model.packages)):
+                return name
         return self.settings.modules.templates.default
 
     def create(self) -> None:
@@ -105,21 +126,14 @@ class ModuleFile(Serializable):
         Returns:
             None.
         """
-        templates = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(
-                self.settings.modules.templates.path
-            )
-        )
-
+        templates = template_environment(self.settings.modules.templates.path)
         template = templates.get_template(self.template)
-        content = template.render(
+        template.stream(
             description=self.model.description,
             build=self.buildinfo(self.id),
             packages=self.model.packages,
             cache_dir=self.settings.container.cache,
-        )
-        with open(self.filename, "w") as file:
-            file.write(content)
+        ).dump(str(self.filename))
         self.artifacts.add(self.filename, Path(self.name, self.filename.name))
 
 
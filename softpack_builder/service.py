@@ -30,20 +30,31 @@ class ServiceAPI(API):
                 "--reload",
                 help="Automatically reload when changes are detected.",
             ),
-        ] = False
+        ] = False,
+        workers: Annotated[
+            int,
+            typer.Option(
+                "--workers",
+                help="Number of worker processes to run.",
+            ),
+        ] = 1,
     ) -> None:
         """Start the SoftPack Builder REST API service.
 
         Args:
             reload: Enable auto-reload.
+            workers: Number of worker processes.
 
         Returns:
             None.
         """
         uvicorn.run(
-            "softpack_builder.app:app.router",
+            "softpack_builder.main:app.router",
             host=app.settings.server.host,
             port=app.settings.server.port,
             reload=reload,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
             log_level="debug",
         )
@@ -4,13 +4,29 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
+import os
 import shutil
-
-from prefect_shell import ShellOperation
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Optional, cast
 
 from .logger import LogMixin
 
 
+@lru_cache(maxsize=None)
+def which(command: str) -> str:
+    """Locate a command in the current PATH, once per command name.
+
+    Args:
+        command: Command to locate.
+
+    Returns:
+        str: Command path, or the command itself if it was not found.
+    """
+    return shutil.which(command) or command
+
+
 class ShellCommand(LogMixin):
     """Base class for shell commands."""
 
@@ -26,8 +42,11 @@ class ShellCommand(LogMixin):
             None.
         """
         super().__init__()
-        self.command = " ".join([self.which(command)] + list(map(str, args)))
+        self.args = [self.which(command)] + list(map(str, args))
+        self.command = " ".join(self.args)
         self.env: dict[str, str] = {}
+        self.output: Optional[Path] = None
+        self.shell = True
         self.kwargs = kwargs
 
     def which(self, command: str) -> str:
@@ -40,7 +59,42 @@ class ShellCommand(LogMixin):
             str: Command path.
 
         """
-        return shutil.which(command) or command
+        return which(command)
+
+    @staticmethod
+    def chain(*commands: "ShellCommand") -> "ShellCommand":
+        """Chain commands to run in one bash shell, each if the last succeeds.
+
+        The commands are not modified. The chain takes the union of their
+        environments, and their keyword arguments and output, which must not
+        conflict. It always runs in bash, so `shell` does not carry over.
+
+        Args:
+            *commands: Commands to run in order.
+
+        Returns:
+            ShellCommand: A new command running the chain.
+
+        Raises:
+            ValueError: If the commands set different keyword arguments or
+                outputs.
+        """
+        kwargs: dict[str, str] = {}
+        outputs = {command.output for command in commands} - {None}
+        for command in commands:
+            for key, value in command.kwargs.items():
+                if kwargs.setdefault(key, value) != value:
+                    raise ValueError(f"conflicting {key} in chained commands")
+        if len(outputs) > 1:
+            raise ValueError("conflicting output in chained commands")
+
+        line = " && ".join(command.command for command in commands)
+        chained = ShellCommand("bash", "-c", line, **kwargs)
+        chained.command = line
+        chained.output = outputs.pop() if outputs else None
+        for command in commands:
+            chained.env |= command.env
+        return chained
 
     def __repr__(self) -> str:
         """String representation of the command.
@@ -53,20 +107,53 @@ class ShellCommand(LogMixin):
     def __call__(self) -> None:
         """Runs the command.
 
+        Output is written straight to `output` when set, without a shell,
+        and only its stderr is logged.
+        Otherwise the command runs in bash, or directly from its argument
+        list if `shell` is unset, and its output is logged.
+
         Returns:
             None.
         """
-        self.logger.info(f"running shell command: {self.command}")
-        # env = {"PYTHONUTF8": "1"}
-
-        with ShellOperation(
-            commands=[self.command],
-            env=self.env,
-            stream_output=True,
-            **self.kwargs,
-        ) as shell:
-            process = shell.trigger()
-            process.wait_for_completion()
+        cwd = self.kwargs.get("working_dir")
+        env = os.environ | self.env
+        if self.output is not None:
+            self.logger.info(
+                "running shell command: %s > %s", self.command, self.output
+            )
+            with open(self.output, "wb") as file:
+                result = subprocess.run(
+                    self.args,
+                    stdout=file,
+                    stderr=subprocess.PIPE,
+                    cwd=cwd,
+                    env=env,
+                    text=True,
+                )
+            for line in result.stderr.splitlines():
+                self.logger.info("%s", line.rstrip())
+            if result.returncode:
+                raise subprocess.CalledProcessError(
+                    result.returncode, self.command, stderr=result.stderr
+                )
+            return
+
+        self.logger.info("running shell command: %s", self.command)
+        argv = ["bash", "-c", self.command] if self.shell else self.args
+        with subprocess.Popen(
+            argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=cwd,
+            env=env,
+            text=True,
+        ) as process:
+            for line in cast(IO[str], process.stdout):
+                self.logger.info("%s", line.rstrip())
+        if process.returncode:
+            raise subprocess.CalledProcessError(
+                process.returncode, self.command
+            )
 
 
 ShellCommand.register_serializer()
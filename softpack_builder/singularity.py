@@ -4,13 +4,14 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
+import contextvars
+import os
 import re
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, cast
 
-from box import Box
-
 from .app import app
 from .artifacts import Artifacts
 from .container import Container
@@ -76,7 +77,7 @@ class Singularity(Container):
     class Builder(Container.Builder):
         """Container builder interface."""
 
-        settings = Box(app.settings.dict())
+        settings = app.settings_box
 
         def __init__(self, **kwargs: Any) -> None:
             """Constructor.
@@ -86,15 +87,27 @@ class Singularity(Container):
             """
             super().__init__(**kwargs)
             self.image = self.path / self.settings.container.singularity.image
+            self.spack = Spack(self.name, self.path)
 
         def build_image(self) -> None:
             """Runs the Singularity build.
 
+            The final stage's spec is prepared while the build stage image
+            is being built, since it does not depend on the build output.
+
             Returns:
                 Path: Image path.
             """
-            for stage in [self.Build, self.Final]:
-                stage(self).build()
+            build, final = self.Build(self), self.Final(self)
+            build.containerize()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                context = contextvars.copy_context()
+                prepared = executor.submit(
+                    lambda: context.run(final.containerize)
+                )
+                build.build()
+                prepared.result()
+            final.build()
 
         def push_image(
             self, registry: Artifacts.Registry, version: str
@@ -152,7 +165,9 @@ class Singularity(Container):
             Returns:
                 Command: A new Command object.
             """
-            return self.command("build", "--force", "--fakeroot", *args)
+            command = self.command("build", "--force", "--fakeroot", *args)
+            command.shell = False
+            return command
 
         def push(self, url: str) -> Command:
             """Push image to a container registry.
@@ -163,7 +178,7 @@ class Singularity(Container):
             Returns:
                 Command: A new Command object.
             """
-            return self.command("push", self.image, url)
+            return self.command("push", str(self.image), url)
 
         def remote_login(self, registry: Artifacts.Registry) -> Command:
             """Login to a remote registry.
@@ -208,7 +223,7 @@ class Singularity(Container):
                 """
                 self.builder = cast(Singularity.Builder, builder)
                 self.settings = self.builder.settings.container.singularity
-                self.spack = Spack(self.builder.name, self.builder.path)
+                self.spack = self.builder.spack
                 self.stage_name = self.__class__.__name__.lower()
                 self.filename = self.builder.path / self.settings.spec.format(
                     stage=self.stage_name
@@ -231,12 +246,11 @@ class Singularity(Container):
                 )
 
             def build(self) -> None:
-                """Builds the stage.
+                """Builds the stage from its containerized spec.
 
                 Returns:
                     None.
                 """
-                self.containerize()
                 self.builder.build(*self.args())()
 
             def patch_manifest(self) -> None:
@@ -279,17 +293,14 @@ class Singularity(Container):
                 Returns:
                     None.
                 """
-                with open(self.filename, "a") as file:
-                    commands = ["# spack build cache"] + list(
-                        map(
-                            lambda package: str(
-                                self.spack.env_buildcache(package)
-                            ),
-                            self.builder.model.packages,
-                        )
-                    )
-                    commands = [f"  {command}\n" for command in commands]
-                    file.writelines(commands)
+                commands = self.spack.env_buildcache_commands(
+                    self.builder.model.packages
+                )
+                lines = ["  # spack build cache\n"] + [
+                    f"  {command}\n" for command in commands
+                ]
+                with open(self.filename, "ab") as file:
+                    file.write("".join(lines).encode())
 
             def args(self) -> list[str]:
                 """Arguments passed to the build command.
@@ -299,7 +310,7 @@ class Singularity(Container):
                 """
                 return [
                     "--bind",
-                    self.settings.build.bind,
+                    os.path.expandvars(self.settings.build.bind),
                     "--sandbox",
                     "build/",
                     str(self.filename),
@@ -318,16 +329,17 @@ class Singularity(Container):
                 for patch in self.settings.patch:
                     regex = re.compile(patch.pattern)
                     if list(filter(regex.match, self.builder.model.packages)):
-                        image = patch[self.stage_name].image
+                        image = getattr(patch, self.stage_name)["image"]
                         break
 
                 with open(self.filename) as file:
                     lines = file.readlines()
 
-                manifest = Box.from_yaml(filename=self.spack.manifest.filename)
+                manifest = self.spack.manifest.load()
+                os_image = manifest["spack"]["container"]["images"]["os"]
                 lines = [
                     re.sub(
-                        fr"^(.*?)\s({manifest.spack.container.images.os})$",
+                        fr"^(.*?)\s({os_image})$",
                         fr"\1 {image}",
                         line,
                     )
@@ -4,23 +4,24 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
+import shlex
 import socket
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import mergedeep
 import yaml
-from box import Box
 
 from .app import app
+from .config.settings import YAMLDumper, YAMLLoader
 from .serializable import Serializable
-from .shell import ShellCommand
+from .shell import ShellCommand, which
 
 
 class Spack(Serializable):
     """Spack interface."""
 
-    settings = Box(app.settings.dict())
+    settings = app.settings_box
 
     class Command(ShellCommand):
         """Spack command."""
@@ -93,7 +94,7 @@ class Spack(Serializable):
         Returns:
             Command: A new Command object.
         """
-        return self.env_command("add", *packages)
+        return self.env_command("add", *map(shlex.quote, packages))
 
     def env_containerize(self, filename: Path) -> Command:
         """Containerize the environment.
@@ -104,7 +105,9 @@ class Spack(Serializable):
         Returns:
             Command: A new Command object.
         """
-        return self.env_command("containerize", ">", str(filename))
+        command = self.env_command("containerize")
+        command.output = filename
+        return command
 
     def env_concretize(self) -> Command:
         """Concretize the environment.
@@ -114,16 +117,13 @@ class Spack(Serializable):
         """
         return self.env_command("concretize")
 
-    def env_buildcache(self, package: str) -> Command:
-        """Push build cache for a package.
-
-        Args:
-            package: A package to cache.
+    def env_buildcache_args(self) -> list[str]:
+        """Arguments for pushing packages to the build cache.
 
         Returns:
-            Command: A new Command object.
+            list[str]: Spack arguments, to be followed by a package name.
         """
-        return self.command(
+        return [
             "--env",
             ".",
             "buildcache",
@@ -131,8 +131,30 @@ class Spack(Serializable):
             "--allow-root",
             "--force",
             socket.gethostname(),
-            package,
-        )
+        ]
+
+    def env_buildcache(self, package: str) -> Command:
+        """Push build cache for a package.
+
+        Args:
+            package: A package to cache.
+
+        Returns:
+            Command: A new Command object.
+        """
+        return self.command(*self.env_buildcache_args(), package)
+
+    def env_buildcache_commands(self, packages: list[str]) -> list[str]:
+        """Command lines that push packages to the build cache.
+
+        Args:
+            packages: Packages to cache.
+
+        Returns:
+            list[str]: One command line per package.
+        """
+        prefix = " ".join([which("spack")] + self.env_buildcache_args())
+        return [f"{prefix} {package}" for package in packages]
 
     def patch_manifest(self, patch: dict[str, Any]) -> None:
         """Patch a environment manifest.
@@ -149,7 +171,9 @@ class Spack(Serializable):
         """Spack manifest abstraction class."""
 
         @staticmethod
-        def represent_str(dumper: yaml.Dumper, data: str) -> yaml.ScalarNode:
+        def represent_str(
+            dumper: yaml.representer.SafeRepresenter, data: str
+        ) -> yaml.ScalarNode:
             """YAML multiline string formatter.
 
             implementation base on:
@@ -166,11 +190,30 @@ class Spack(Serializable):
                 return dumper.represent_scalar(tag, data, style='|')
             return dumper.represent_scalar(tag, data)
 
+        class Dumper(YAMLDumper):
+            """YAML dumper writing multiline strings as literal blocks."""
+
         def __init__(self, spack: "Spack") -> None:
             """Constructor."""
             self.spack = spack
             self.settings = self.spack.settings
             self.filename = self.spack.path / self.settings.spack.manifest.name
+            self.cache: Optional[tuple[int, dict[str, Any]]] = None
+
+        def load(self) -> dict[str, Any]:
+            """Load the manifest, reusing the last parse if file is unchanged.
+
+            Returns:
+                dict[str, Any]: Manifest contents.
+            """
+            mtime = self.filename.stat().st_mtime_ns
+            if self.cache is None or self.cache[0] != mtime:
+                with open(self.filename, "rb") as file:
+                    self.cache = (
+                        mtime,
+                        yaml.load(file, Loader=YAMLLoader),
+                    )
+            return self.cache[1]
 
         def patch(self, patch: dict[str, Any]) -> None:
             """Patch a manifest.
@@ -181,16 +224,22 @@ class Spack(Serializable):
             Returns:
                 None
             """
-            yaml.add_representer(str, self.represent_str)
-
-            manifest = Box.from_yaml(filename=self.filename)
-            manifest.spack = mergedeep.merge(
-                manifest.spack, self.settings.spack.manifest.spack
+            manifest = self.load()
+            mergedeep.merge(
+                manifest["spack"],
+                self.settings.spack.manifest.spack.to_dict(),
+                patch,
             )
-            manifest.spack = mergedeep.merge(manifest.spack, patch)
 
             with open(self.filename, "w") as file:
-                yaml.dump(manifest.to_dict(), file, sort_keys=False)
+                yaml.dump(
+                    manifest,
+                    file,
+                    Dumper=self.Dumper,
+                    sort_keys=False,
+                )
+            self.cache = (self.filename.stat().st_mtime_ns, manifest)
 
 
+Spack.Manifest.Dumper.add_representer(str, Spack.Manifest.represent_str)
 Spack.register_serializer()
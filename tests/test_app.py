@@ -4,9 +4,11 @@ This source code is licensed under the MIT license found in the
 LICENSE file in the root directory of this source tree.
 """
 
+import re
+
 import httpx
 
-from softpack_builder.app import Application
+from softpack_builder.app import app, timestamp
 
 
 def test_root(client) -> None:
@@ -14,6 +16,12 @@ def test_root(client) -> None:
     assert response.status_code == httpx.codes.OK
 
 
+def test_timestamp() -> None:
+    pattern = r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{6}$"
+    assert re.match(pattern, timestamp())
+    assert re.match(pattern, timestamp())
+
+
 def test_openapi_docs(client) -> None:
     response = client.get("/docs")
     assert response.status_code == httpx.codes.OK
@@ -28,7 +36,6 @@ def test_register_api(capsys) -> None:
     class TestAPI:
         pass
 
-    app = Application()
     app.register_api(TestAPI)
     captured = capsys.readouterr()
     assert (
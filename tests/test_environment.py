@@ -6,15 +6,19 @@ LICENSE file in the root directory of this source tree.
 
 
 import logging
+import pickle
 import shutil
+import uuid
 from pathlib import Path
 
+import cloudpickle
 import httpx
 import prefect
 import pytest
 import yaml
 from box import Box
 
+from softpack_builder.artifacts import Artifacts
 from softpack_builder.environment import (
     Environment,
     EnvironmentAPI,
@@ -31,6 +35,11 @@ def pytest_generate_tests(metafunc):
         metafunc.parametrize(fixture, param)
 
 
+def test_environment_artifacts_pickle() -> None:
+    artifacts = pickle.loads(cloudpickle.dumps(Artifacts("test")))
+    assert artifacts.settings.artifacts.registries.default.url
+
+
 def test_environment_build_api(client, spec) -> None:
     model = Environment.Model.from_yaml(spec)
     response = client.post(
@@ -40,6 +49,59 @@ def test_environment_build_api(client, spec) -> None:
     assert response.status_code == httpx.codes.OK
 
 
+def test_environment_build_api_invalid(client) -> None:
+    url = EnvironmentAPI.url("build")
+    for content in [b"{", b"[]"]:
+        response = client.post(
+            url, content=content, headers={"content-type": "application/json"}
+        )
+        assert response.status_code == httpx.codes.UNPROCESSABLE_ENTITY
+    paths = client.get("/openapi.json").json()["paths"]
+    assert paths["/environments/build"]["post"]["requestBody"]["required"]
+
+
+def test_environment_build_api_invalid_params(client) -> None:
+    url = EnvironmentAPI.url("build")
+    model = {"description": "test", "packages": ["zlib"]}
+    for params in [
+        {"name": "test"},
+        {"name": "test", "model": model, "extra": True},
+        {"name": "test", "model": {"description": "test"}},
+        {"name": "test", "model": model | {"extra": True}},
+        {"name": "test", "model": []},
+    ]:
+        response = client.post(url, json=params)
+        assert response.status_code == httpx.codes.UNPROCESSABLE_ENTITY
+
+
+def test_environment_build_api_inflight(client, spec) -> None:
+    model = Environment.Model.from_yaml(spec)
+    params = {"name": Path(spec).stem, "model": model.dict()}
+    first = client.post(EnvironmentAPI.url("build"), json=params)
+    second = client.post(EnvironmentAPI.url("build"), json=params)
+    assert first.json()["id"] == second.json()["id"]
+
+
+def test_environment_build_api_inflight_final(monkeypatch) -> None:
+    def run(flow, parameters):
+        runs.append(uuid.uuid4())
+        return Box(id=runs[-1])
+
+    def read_flow_run(id):
+        return Box(id=id, state=Box(is_final=lambda: True))
+
+    runs: list[uuid.UUID] = []
+    deployments = EnvironmentAPI.deployments
+    monkeypatch.setattr(deployments, "run", run)
+    monkeypatch.setattr(deployments, "read_flow_run", read_flow_run)
+    monkeypatch.setattr(EnvironmentAPI, "inflight", {})
+    first = EnvironmentAPI.run_once(b"key", {})
+    second = EnvironmentAPI.run_once(b"key", {})
+    assert first.id != second.id
+    assert list(EnvironmentAPI.inflight) == [b"key"]
+    assert EnvironmentAPI.inflight[b"key"].result() == second.id
+
+
 def test_environment_build_command(service_thread, cli, spec) -> None:
     response = cli.invoke(
         EnvironmentAPI.command("build", spec, "--name", spec)
@@ -0,0 +1,51 @@
+"""Copyright (c) 2023 Genome Research Ltd.
+
+This source code is licensed under the MIT license found in the
+LICENSE file in the root directory of this source tree.
+"""
+
+import subprocess
+
+import pytest
+from prefect import flow
+
+from softpack_builder.shell import ShellCommand
+
+
+def test_shell_command_chain_output(tmp_path) -> None:
+    @flow
+    def run_chain() -> None:
+        first = ShellCommand("echo", "first")
+        last = ShellCommand("echo", "last")
+        last.output = tmp_path / "output"
+        command = ShellCommand.chain(first, last)
+        command()
+        assert first.command.endswith("echo first")
+        assert first.output is None
+
+    run_chain()
+    assert (tmp_path / "output").read_text() == "first\nlast\n"
+
+
+def test_shell_command_output_stderr(tmp_path) -> None:
+    @flow
+    def run_failing() -> None:
+        command = ShellCommand("ls", str(tmp_path / "missing"))
+        command.output = tmp_path / "output"
+        command()
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        run_failing()
+    assert "missing" in e.value.stderr
+
+
+def test_shell_command_chain_conflict(tmp_path) -> None:
+    @flow
+    def chain_conflict() -> None:
+        ShellCommand.chain(
+            ShellCommand("true", working_dir=str(tmp_path)),
+            ShellCommand("true", working_dir="/"),
+        )
+
+    with pytest.raises(ValueError):
+        chain_conflict()
@@ -0,0 +1,33 @@
+"""Copyright (c) 2023 Genome Research Ltd.
+
+This source code is licensed under the MIT license found in the
+LICENSE file in the root directory of this source tree.
+"""
+
+
+import yaml
+
+from softpack_builder.spack import Spack
+
+
+def test_spack_manifest_patch(tmp_path) -> None:
+    spack = Spack("test", tmp_path)
+    spack.manifest.filename.write_text("spack:\n  specs:\n  - zlib\n")
+    for stage in ["build", "final"]:
+        spack.patch_manifest({"container": {"template": f"{stage}.def"}})
+
+    with open(spack.manifest.filename) as file:
+        manifest = yaml.safe_load(file)
+    assert manifest["spack"]["specs"] == ["zlib"]
+    assert manifest["spack"]["container"]["template"] == "final.def"
+    assert manifest["spack"]["container"]["images"]["os"] == "ubuntu:20.04"
+
+
+def test_spack_env_buildcache_commands(tmp_path) -> None:
+    spack = Spack("test", tmp_path)
+    commands = spack.env_buildcache_commands(["zlib", "py-numpy"])
+    prefix = " ".join(spack.env_buildcache_args())
+    assert [command.split(" ", 1)[1] for command in commands] == [
+        f"{prefix} zlib",
+        f"{prefix} py-numpy",
+    ]